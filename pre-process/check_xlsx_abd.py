@@ -1,11 +1,31 @@
+import bisect
 import os
 import re
-import pandas as pd
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from tkinter import filedialog
+from python_calamine import CalamineWorkbook
 from tqdm import tqdm
 
 
+# Sheet names accepted as the data sheet, and the required columns;
+# hoisted to module scope so they are built once, not per folder/file
+SHEET_TARGETS = frozenset({'data', 'base'})
+
+EXACT_MATCH_COLUMNS = [
+    'EMPLID', 'JOB_CODE_DESCRIPTION', 'BAND',
+    'CURRENT_LOCATION_DESCRIPTION', 'PROJECT_ID', 'PROJECT_DESCRIPTION',
+    'PROJECT_TYPE_DESC', 'CUSTOMER_NAME', 'PROGRAM_MANAGER_NAME'
+]
+
+PREFIX_MATCH_COLUMNS = [
+    'Technical/', 'PROJECT_PRICING_TYPE'
+]
+
+FILE_PATTERN = re.compile(r'^\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
+
+
 def find_sheet_name(xls_file):
     """
     Checks for a sheet named 'data' or 'base' (case-insensitive) in an Excel file.
@@ -13,25 +33,29 @@ def find_sheet_name(xls_file):
     """
     sheet_names = xls_file.sheet_names
     for name in sheet_names:
-        if name.lower() in ['data', 'base']:
+        if name.lower() in SHEET_TARGETS:
             return name
     return None
 
 
-def validate_columns(df, exact_cols, prefix_cols, file_path, log_func=print):
+def validate_columns(columns, exact_cols, prefix_cols, file_path, log_func=print):
     """
-    Validates if the required columns exist in the DataFrame.
+    Validates if the required columns exist in the header row.
     Reports missing and found columns to the console using a logger function.
     """
     all_found = True
-    df_columns = df.columns.to_list()
+    df_columns = [str(col) for col in columns]
+    # Set gives O(1) membership checks; the sorted copy lets bisect find
+    # prefix matches without scanning every column per prefix
+    df_col_set = set(df_columns)
+    sorted_columns = sorted(df_columns)
     filename = os.path.basename(file_path)
 
     log_func(f"[INFO]    Validating columns for '{filename}'...")
 
     # --- Check for columns that must match exactly ---
     for col in exact_cols:
-        if col in df_columns:
+        if col in df_col_set:
             log_func(f"[FOUND]   File: '{filename}' - Found exact column: '{col}'")
         else:
             log_func(f"[MISSING] File: '{filename}' - Exact column not found: '{col}'")
@@ -39,8 +63,11 @@ def validate_columns(df, exact_cols, prefix_cols, file_path, log_func=print):
 
     # --- Check for columns that must match a prefix ---
     for prefix in prefix_cols:
-        # Find the column that matches the prefix
-        matching_col = next((df_col for df_col in df_columns if str(df_col).startswith(prefix)), None)
+        # Find the first column that matches the prefix
+        pos = bisect.bisect_left(sorted_columns, prefix)
+        matching_col = (sorted_columns[pos]
+                        if pos < len(sorted_columns) and sorted_columns[pos].startswith(prefix)
+                        else None)
         if matching_col:
             log_func(f"[FOUND]   File: '{filename}' - Found column with prefix '{prefix}': '{matching_col}'")
         else:
@@ -50,6 +77,43 @@ def validate_columns(df, exact_cols, prefix_cols, file_path, log_func=print):
     return all_found
 
 
+def validate_one(file_path, exact_cols, prefix_cols):
+    """
+    Validates a single workbook and returns (filename, ok, log_lines).
+    Runs in a worker process, so log output is buffered instead of printed.
+    """
+    filename = os.path.basename(file_path)
+    log_lines = []
+    log = log_lines.append
+    ok = False
+
+    try:
+        # List the sheets with the fast Rust-backed calamine reader
+        workbook = CalamineWorkbook.from_path(file_path)
+        sheet_to_read = find_sheet_name(workbook)
+
+        if sheet_to_read:
+            log(f"[INFO]    Found sheet: '{sheet_to_read}'")
+            # Pull the header row from the workbook handle that is already
+            # open, so the zip and shared strings are only parsed once
+            header_rows = workbook.get_sheet_by_name(sheet_to_read).to_python(nrows=1)
+            columns = header_rows[0] if header_rows else []
+
+            # Validate the header columns, passing the log function
+            if validate_columns(columns, exact_cols, prefix_cols, file_path, log_func=log):
+                ok = True
+                log(f"[SUCCESS] '{filename}' passed all checks.")
+            else:
+                log(f"[FAILURE] '{filename}' has validation issues.")
+        else:
+            log(f"[ERROR]   File: '{filename}' - Neither 'data' nor 'base' sheet was found.")
+
+    except Exception as e:
+        log(f"[ERROR]   Could not read file '{filename}'. Reason: {e}")
+
+    return filename, ok, log_lines
+
+
 def process_folder(folder_path):
     """
     Main function to iterate through files in a folder and validate them.
@@ -60,53 +124,29 @@ def process_folder(folder_path):
 
     print(f"--- Starting validation in folder: {folder_path} ---\n")
 
-    # Define the required columns
-    exact_match_columns = [
-        'EMPLID', 'JOB_CODE_DESCRIPTION', 'BAND',
-        'CURRENT_LOCATION_DESCRIPTION', 'PROJECT_ID', 'PROJECT_DESCRIPTION',
-        'PROJECT_TYPE_DESC', 'CUSTOMER_NAME', 'PROGRAM_MANAGER_NAME'
-    ]
-
-    prefix_match_columns = [
-        'Technical/', 'PROJECT_PRICING_TYPE'
-    ]
-
-    # Regex to match filenames like 'MM-YYYY.xlsx'
-    file_pattern = re.compile(r'^\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-
-    # Filter for files that match the pattern to use with the progress bar
-    matching_files = [f for f in os.listdir(folder_path) if file_pattern.match(f)]
+    # Filter for files that match the pattern to use with the progress bar;
+    # scandir lets us skip directories without an extra stat per entry
+    with os.scandir(folder_path) as it:
+        matching_files = [e.name for e in it if e.is_file() and FILE_PATTERN.match(e.name)]
     found_files_count = len(matching_files)
     validated_files_count = 0
 
     if found_files_count > 0:
-        # Use tqdm.write for logging to prevent interfering with the progress bar
-        log = tqdm.write
-        for filename in tqdm(matching_files, desc="Validating files", unit="file"):
-            file_path = os.path.join(folder_path, filename)
-            log(f"\n--- Processing file: {filename} ---")
-
-            try:
-                # Load the excel file to check for sheets
-                xls = pd.ExcelFile(file_path)
-                sheet_to_read = find_sheet_name(xls)
-
-                if sheet_to_read:
-                    log(f"[INFO]    Found sheet: '{sheet_to_read}'")
-                    # If a valid sheet is found, read it into a dataframe
-                    df = pd.read_excel(xls, sheet_name=sheet_to_read)
-
-                    # Validate the columns in the dataframe, passing the log function
-                    if validate_columns(df, exact_match_columns, prefix_match_columns, file_path, log_func=log):
-                        validated_files_count += 1
-                        log(f"[SUCCESS] '{filename}' passed all checks.")
-                    else:
-                        log(f"[FAILURE] '{filename}' has validation issues.")
-                else:
-                    log(f"[ERROR]   File: '{filename}' - Neither 'data' nor 'base' sheet was found.")
-
-            except Exception as e:
-                log(f"[ERROR]   Could not read file '{filename}'. Reason: {e}")
+        file_paths = [os.path.join(folder_path, f) for f in matching_files]
+
+        # Validate the files in parallel; each worker buffers its own log lines
+        # so the output is emitted per file without interleaving.
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = executor.map(validate_one, file_paths,
+                                   repeat(EXACT_MATCH_COLUMNS), repeat(PREFIX_MATCH_COLUMNS),
+                                   chunksize=1)
+            for filename, ok, log_lines in tqdm(results, total=found_files_count,
+                                                desc="Validating files", unit="file"):
+                tqdm.write(f"\n--- Processing file: {filename} ---")
+                for line in log_lines:
+                    tqdm.write(line)
+                if ok:
+                    validated_files_count += 1
 
     print("\n--- Validation Complete ---")
     if found_files_count == 0:
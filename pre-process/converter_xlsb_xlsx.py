@@ -1,8 +1,44 @@
 import os
-import win32com.client as win32
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
 from tkinter import filedialog
 
+import xlsxwriter
+from python_calamine import CalamineWorkbook
+
+
+def convert_xlsb_file(xlsb_path):
+    """
+    Converts a single .xlsb workbook to .xlsx using the pure-python
+    calamine reader and xlsxwriter's streaming writer. No Excel
+    installation is required, so this also runs on Linux/CI.
+    Returns the path of the written .xlsx file.
+    """
+    xlsx_path = os.path.splitext(xlsb_path)[0] + '.xlsx'
+
+    workbook = CalamineWorkbook.from_path(xlsb_path)
+    # constant_memory streams each row straight to disk instead of
+    # buffering whole sheets in memory.
+    with xlsxwriter.Workbook(xlsx_path, {'constant_memory': True}) as out_wb:
+        for sheet_name in workbook.sheet_names:
+            # Excel caps sheet names at 31 characters
+            worksheet = out_wb.add_worksheet(sheet_name[:31])
+            for i, row in enumerate(workbook.get_sheet_by_name(sheet_name).to_python()):
+                worksheet.write_row(i, 0, row)
+
+    return xlsx_path
+
+
+def convert_one(xlsb_path):
+    """
+    Worker wrapper for the process pool: converts a single file and
+    returns (xlsb_path, xlsx_path or None, error message or None).
+    """
+    try:
+        return xlsb_path, convert_xlsb_file(xlsb_path), None
+    except Exception as e:
+        return xlsb_path, None, str(e)
+
 
 def batch_convert_with_gui():
     """
@@ -22,46 +58,39 @@ def batch_convert_with_gui():
 
     print(f"Scanning folder: {folder_path}\n")
 
-    excel = None
-    try:
-        # --- Step 2: Start one instance of Excel for all files (much faster) ---
-        excel = win32.Dispatch("Excel.Application")
-        excel.Visible = False
-        excel.DisplayAlerts = False
-
-        # --- Step 3: Walk through the directory tree ---
-        for dirpath, _, filenames in os.walk(folder_path):
-            for filename in filenames:
-                if filename.lower().endswith(".xlsb"):
-                    xlsb_path = os.path.join(dirpath, filename)
-                    xlsx_path = os.path.splitext(xlsb_path)[0] + '.xlsx'
-
-                    try:
-                        print(f"Found & converting: {xlsb_path}")
+    # --- Step 2: Collect every .xlsb first so the work can be spread
+    # across worker processes. Walking the absolute root means every
+    # derived path is already absolute, so no per-file abspath calls
+    # are needed. ---
+    folder_abs = os.path.abspath(folder_path)
+    join = os.path.join
+    xlsb_paths = [join(dirpath, filename)
+                  for dirpath, _, filenames in os.walk(folder_abs)
+                  for filename in filenames
+                  if filename.lower().endswith(".xlsb")]
 
-                        # Open the workbook using its absolute, cleaned path
-                        # ▼▼▼ THIS LINE IS THE FIX ▼▼▼
-                        wb = excel.Workbooks.Open(os.path.abspath(xlsb_path))
-
-                        # Save in the .xlsx format, also using an absolute path for safety
-                        # ▼▼▼ THIS LINE IS ALSO UPDATED FOR BEST PRACTICE ▼▼▼
-                        wb.SaveAs(os.path.abspath(xlsx_path), FileFormat=51)
+    if not xlsb_paths:
+        print("No .xlsb files found.")
+        print("\nProcessing complete.")
+        return
 
-                        wb.Close()
-                        print(f"  -> Successfully saved as {xlsx_path}")
+    print(f"Found {len(xlsb_paths)} .xlsb file(s). Converting in parallel...\n")
 
-                    except Exception as e:
-                        print(f"  -> FAILED to convert {filename}. Error: {e}")
+    # --- Step 3: Convert in parallel. The work is CPU-bound in the
+    # calamine decode and xlsx zip compression, so independent worker
+    # processes scale near-linearly. ---
+    workers = min(4, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for xlsb_path, xlsx_path, error in executor.map(convert_one, xlsb_paths):
+            if error is None:
+                print(f"Converted: {xlsb_path}")
+                print(f"  -> Successfully saved as {xlsx_path}")
+            else:
+                print(f"  -> FAILED to convert {os.path.basename(xlsb_path)}. Error: {error}")
 
-    except Exception as e:
-        print(f"A critical error occurred: {e}")
-    finally:
-        # --- Step 4: Close the Excel application ---
-        if excel:
-            excel.Quit()
-        print("\nProcessing complete.")
+    print("\nProcessing complete.")
 
 
 # --- Run the main function ---
 if __name__ == "__main__":
-    batch_convert_with_gui()
\ No newline at end of file
+    batch_convert_with_gui()
@@ -2,9 +2,81 @@ import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
 import os
-from tqdm import tqdm
 import glob
-import csv
+from openpyxl import load_workbook
+
+try:
+    from xlsx2csv import Xlsx2csv
+except ImportError:
+    Xlsx2csv = None  # Fall back to the pandas-based conversion below
+
+
+def convert_with_pandas(excel_file_path, csv_file_path):
+    """
+    Fallback conversion path: reads the 'base' sheet into a DataFrame and
+    writes it out row by row. Used only when xlsx2csv is not installed.
+    Returns the name of the sheet that was converted.
+    """
+    # --- Logic for case-insensitive sheet finding ---
+    # Discover sheet names with a read-only openpyxl load; this avoids
+    # materializing the whole workbook object model just to list sheets
+    wb = load_workbook(excel_file_path, read_only=True, data_only=True, keep_links=False)
+    sheet_names = wb.sheetnames
+
+    target_sheet_name = None
+    # Loop through all sheet names to find a match
+    for sheet in sheet_names:
+        # .strip() removes leading/trailing spaces, .lower() makes it lowercase
+        if sheet.strip().lower() == 'base':
+            target_sheet_name = sheet  # Store the original sheet name
+            break  # Stop looking once we've found it
+
+    if target_sheet_name is None:
+        # If no match was found after checking all sheets, raise an error
+        wb.close()
+        raise ValueError("Sheet 'base' not found (checked case-insensitively with spaces trimmed).")
+
+    # Read the data from the workbook handle that is already open, so the
+    # zip and shared strings are only decoded once
+    print(f"Found sheet '{target_sheet_name}', reading data...")
+    ws = wb[target_sheet_name]
+    row_iter = ws.iter_rows(values_only=True)
+    header = next(row_iter, None)
+    df = pd.DataFrame(row_iter, columns=header)
+    wb.close()
+
+    # Write the whole frame in one C-level pass instead of looping over
+    # iterrows; chunksize keeps the write buffers bounded on huge sheets.
+    print(f"Writing {df.shape[0]} rows to CSV...")
+    df.to_csv(csv_file_path, index=False, encoding='utf-8-sig', chunksize=50000)
+
+    return target_sheet_name
+
+
+def convert_with_xlsx2csv(excel_file_path, csv_file_path):
+    """
+    Streams the 'base' sheet straight from SAX parse events to CSV.
+    No DataFrame or row list is ever built, so memory stays constant.
+    Returns the name of the sheet that was converted.
+    """
+    converter = Xlsx2csv(excel_file_path, outputencoding='utf-8-sig')
+
+    target_sheet_name = None
+    target_sheet_id = None
+    # Resolve the sheet id case-insensitively with spaces trimmed
+    for sheet in converter.workbook.sheets:
+        if sheet['name'].strip().lower() == 'base':
+            target_sheet_name = sheet['name']
+            target_sheet_id = sheet['id']
+            break
+
+    if target_sheet_id is None:
+        raise ValueError("Sheet 'base' not found (checked case-insensitively with spaces trimmed).")
+
+    print(f"Found sheet '{target_sheet_name}', streaming rows to CSV...")
+    converter.convert(csv_file_path, sheetid=target_sheet_id)
+
+    return target_sheet_name
 
 
 def convert_excel_to_csv(folder_path):
@@ -34,40 +106,16 @@ def convert_excel_to_csv(folder_path):
                 # Log the start of processing for the current file
                 print(f"\n--- Starting to process: {file_name} ---")
 
-                # --- Logic for case-insensitive sheet finding ---
-                # First, get all sheet names from the Excel file
-                xls = pd.ExcelFile(excel_file_path)
-                sheet_names = xls.sheet_names
-
-                target_sheet_name = None
-                # Loop through all sheet names to find a match
-                for sheet in sheet_names:
-                    # .strip() removes leading/trailing spaces, .lower() makes it lowercase
-                    if sheet.strip().lower() == 'base':
-                        target_sheet_name = sheet  # Store the original sheet name
-                        break  # Stop looking once we've found it
-
-                if target_sheet_name is None:
-                    # If no match was found after checking all sheets, raise an error
-                    raise ValueError("Sheet 'base' not found (checked case-insensitively with spaces trimmed).")
-
-                # Read the data using the correctly identified sheet name
-                print(f"Found sheet '{target_sheet_name}', reading data...")
-                df = pd.read_excel(excel_file_path, sheet_name=target_sheet_name)
-
                 # Create the output CSV file path
                 base_name_without_ext = os.path.splitext(file_name)[0]
                 csv_file_path = os.path.join(folder_path, f"{base_name_without_ext}.csv")
 
-                # --- NEW LOGIC: Write row-by-row with a progress bar ---
-                # Open the CSV file for writing
-                with open(csv_file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.writer(f)
-                    # Write the header first
-                    writer.writerow(df.columns)
-                    # Write the data rows with a tqdm progress bar
-                    for index, row in tqdm(df.iterrows(), total=df.shape[0], desc="Writing rows", unit="row"):
-                        writer.writerow(row)
+                # Prefer the streaming converter; fall back to pandas if
+                # xlsx2csv is not available in this environment.
+                if Xlsx2csv is not None:
+                    target_sheet_name = convert_with_xlsx2csv(excel_file_path, csv_file_path)
+                else:
+                    target_sheet_name = convert_with_pandas(excel_file_path, csv_file_path)
 
                 print(f"Successfully converted '{target_sheet_name}' sheet from: {file_name}")
 
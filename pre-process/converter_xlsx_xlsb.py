@@ -1,9 +1,11 @@
 import os
 import sys
-import win32com.client as win32
+from pathlib import Path
 from tkinter import Tk, filedialog
 from tqdm import tqdm
 
+from excel_session import open_excel_session, open_workbook, save_workbook_as, close_excel_session
+
 """
 A Python script to batch convert .xlsx (Open XML Spreadsheet) files in a
 user-selected folder to .xlsb (Binary Spreadsheet) format.
@@ -43,6 +45,44 @@ def select_folder():
     return folder_selected
 
 
+# VBA macro that performs the whole conversion loop inside the Excel
+# process. FileFormat 50 is xlExcelBinaryWorkbook (.xlsb).
+CONVERT_FOLDER_MACRO = '''
+Sub ConvertFolderToXlsb(folderPath As String)
+    Dim fileName As String
+    Dim baseName As String
+    Dim wb As Workbook
+    fileName = Dir(folderPath & "\\*.xlsx")
+    Do While fileName <> ""
+        baseName = Left(fileName, InStrRev(fileName, ".") - 1)
+        Set wb = Workbooks.Open(folderPath & "\\" & fileName, UpdateLinks:=0, ReadOnly:=True)
+        wb.SaveAs folderPath & "\\" & baseName & ".xlsb", FileFormat:=50
+        wb.Close SaveChanges:=False
+        fileName = Dir()
+    Loop
+End Sub
+'''
+
+
+def convert_folder_in_process(excel_app, folder_path):
+    """
+    Injects a temporary VBA module and runs the conversion loop entirely
+    inside Excel, so each file costs zero COM round-trips instead of the
+    open/save/close marshalling hops of the per-file path.
+
+    Requires 'Trust access to the VBA project object model' in Excel's
+    Trust Center; raises when the VBE is locked down so the caller can
+    fall back to per-file COM calls.
+    """
+    host_wb = excel_app.Workbooks.Add()
+    try:
+        module = host_wb.VBProject.VBComponents.Add(1)  # vbext_ct_StdModule
+        module.CodeModule.AddFromString(CONVERT_FOLDER_MACRO)
+        excel_app.Run("ConvertFolderToXlsb", os.path.abspath(folder_path))
+    finally:
+        host_wb.Close(SaveChanges=False)
+
+
 def convert_all_xlsx_in_folder(folder_path):
     """
     Finds all .xlsx files in a given folder and converts them to .xlsb.
@@ -52,12 +92,12 @@ def convert_all_xlsx_in_folder(folder_path):
         folder_path (str): The full path to the folder containing .xlsx files.
     """
     excel_app = None
+    owns_excel = True
     try:
         print("[LOG] Starting Microsoft Excel application in the background...")
-        # Start a single instance of the Excel application in the background.
-        excel_app = win32.Dispatch('Excel.Application')
-        excel_app.Visible = False
-        excel_app.DisplayAlerts = False
+        # Reuse a running Excel instance when available (skips the
+        # EXCEL.EXE cold start), otherwise start a dedicated one.
+        excel_app, owns_excel = open_excel_session()
         print("[LOG] Excel application started successfully.")
 
         # Find all files in the directory with the .xlsx extension.
@@ -69,31 +109,46 @@ def convert_all_xlsx_in_folder(folder_path):
             return
 
         print(f"[LOG] Found {len(xlsx_files)} .xlsx file(s). Starting conversion process.")
+
+        # Prefer converting the whole folder inside Excel via a temporary
+        # macro; this removes the per-file COM marshalling entirely.
+        try:
+            print("[LOG] Converting in-process via a temporary VBA macro...")
+            convert_folder_in_process(excel_app, folder_path)
+            print(f"\n[COMPLETE] Batch conversion finished for {len(xlsx_files)} file(s).")
+            return
+        except Exception as e:
+            print(f"[WARN] In-process conversion unavailable ({e}).")
+            print("[WARN] Falling back to per-file COM calls.")
+
         successful_conversions = 0
 
+        # Normalize the folder once; per-file paths are then built with a
+        # single join/with_suffix instead of abspath+splitext per file.
+        folder_abs = Path(os.path.abspath(folder_path))
+
         # Loop through each found file and convert it, using tqdm for a progress bar.
         for filename in tqdm(xlsx_files, desc="Converting Files", unit="file"):
-            input_path = os.path.join(folder_path, filename)
-            output_path = os.path.splitext(input_path)[0] + '.xlsb'
+            input_path = folder_abs / filename
+            output_path = input_path.with_suffix('.xlsb')
 
-            # Use absolute paths to be safe.
-            input_path_abs = os.path.abspath(input_path)
-            output_path_abs = os.path.abspath(output_path)
+            input_path_abs = str(input_path)
+            output_path_abs = str(output_path)
             workbook = None  # Initialize workbook to None
 
             try:
                 tqdm.write(f"\n[PROCESS] Converting '{filename}'...")
                 tqdm.write(f"  [STEP] Opening workbook...")
-                # Open the source workbook.
-                workbook = excel_app.Workbooks.Open(input_path_abs)
+                # Open the source workbook read-only without link updates.
+                workbook = open_workbook(excel_app, input_path_abs)
                 tqdm.write(f"  [STEP] Workbook loaded.")
 
                 # The FileFormat constant for .xlsb is 50 (xlExcelBinaryWorkbook).
                 file_format_xlsb = 50
 
                 tqdm.write(f"  [STEP] Saving as .xlsb format...")
-                # Save the workbook in the new format.
-                workbook.SaveAs(output_path_abs, FileFormat=file_format_xlsb)
+                # Save in the new format without link updates or recalculation.
+                save_workbook_as(workbook, output_path_abs, file_format_xlsb)
 
                 tqdm.write(f"  [SUCCESS] Saved as '{os.path.basename(output_path)}'")
                 successful_conversions += 1
@@ -116,7 +171,7 @@ def convert_all_xlsx_in_folder(folder_path):
         # Crucially, always ensure the Excel application process is terminated.
         if excel_app:
             print("[LOG] Closing Microsoft Excel application...")
-            excel_app.Quit()
+            close_excel_session(excel_app, owns_excel)
             # Release the COM object.
             del excel_app
             print("[LOG] Excel application closed.")
@@ -0,0 +1,126 @@
+import pythoncom
+import win32com.client as win32
+
+"""
+Shared Excel COM session helpers for the batch converter scripts.
+
+Both converters drive one background Excel.Application instance. The
+session is configured so that opening and saving workbooks skips the
+expensive parts: formula recalculation, screen painting, event macros
+and external-link prompts. For large financial workbooks the recalc on
+open/save usually dominates the conversion time.
+
+An already-running Excel is reused when one is registered in the COM
+running object table, which skips the EXCEL.EXE cold start on repeated
+runs; the caller only quits the instance it actually created.
+"""
+
+# Excel calculation mode constant (XlCalculation enumeration)
+XL_CALCULATION_MANUAL = -4135
+
+# Application settings captured when attaching to the user's running
+# Excel, keyed by the COM object's id, so close_excel_session can put
+# the instance back exactly the way it was found
+_saved_app_state = {}
+
+# The settings the batch session mutates, in the order they are restored;
+# Calculation goes first so any recalc it triggers happens while alerts
+# and events are still suppressed
+_SESSION_PROPS = ('Calculation', 'AskToUpdateLinks', 'EnableEvents',
+                  'ScreenUpdating', 'DisplayAlerts')
+
+
+def open_excel_session():
+    """
+    Attaches to a running Excel.Application if one exists, otherwise
+    starts a fresh dedicated instance, and configures it for batch
+    conversion work. Returns (excel, owns_excel); owns_excel tells the
+    caller whether close_excel_session should quit the application.
+    """
+    try:
+        # Lets the session be created from a worker thread; a no-op (or
+        # harmless mode-mismatch error) when COM is already initialised.
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+    except Exception:
+        pass
+
+    try:
+        excel = win32.GetActiveObject("Excel.Application")
+        owns_excel = False
+    except Exception:
+        # DispatchEx forces a new dedicated process rather than binding
+        # to whatever instance the shell would reuse.
+        excel = win32.DispatchEx("Excel.Application")
+        owns_excel = True
+
+    if owns_excel:
+        # A dedicated instance has no user state to preserve, and only it
+        # gets hidden: an attached session belongs to the user, and their
+        # window stays visible.
+        excel.Visible = False
+    else:
+        saved = {}
+        for prop in _SESSION_PROPS:
+            try:
+                saved[prop] = getattr(excel, prop)
+            except Exception:
+                pass
+        _saved_app_state[id(excel)] = saved
+
+    excel.DisplayAlerts = False
+    excel.ScreenUpdating = False
+    excel.EnableEvents = False
+    excel.AskToUpdateLinks = False
+    try:
+        excel.Calculation = XL_CALCULATION_MANUAL
+    except Exception:
+        # Some Excel versions refuse to set Calculation while no workbook
+        # is open yet; the converters still work, just without manual calc.
+        pass
+    return excel, owns_excel
+
+
+def open_workbook(excel, path):
+    """
+    Opens a workbook read-only without link updates, prompts or MRU
+    churn, so Excel does not recalculate sheets merely for the open.
+    """
+    return excel.Workbooks.Open(path, UpdateLinks=0, ReadOnly=True,
+                                IgnoreReadOnlyRecommended=True, Notify=False,
+                                AddToMru=False)
+
+
+def save_workbook_as(workbook, path, file_format):
+    """
+    Saves the workbook to a new format without recalculation side
+    effects: links were never updated (UpdateLinks=0 at open), so their
+    formulas carry over unchanged, and conflicts resolve to the local
+    session instead of prompting.
+    """
+    try:
+        workbook.ForceFullCalculation = False
+    except Exception:
+        pass
+    # ConflictResolution=2 is xlLocalSessionChanges
+    workbook.SaveAs(path, FileFormat=file_format, ConflictResolution=2,
+                    CreateBackup=False, AddToMru=False)
+
+
+def close_excel_session(excel, owns_excel=True):
+    """
+    Quits an Excel instance the session created; an attached instance is
+    instead restored to the settings it was found with, so the user's
+    Excel is not left hidden or with events disabled after a run.
+    """
+    if not excel:
+        return
+    if owns_excel:
+        excel.Quit()
+        return
+    saved = _saved_app_state.pop(id(excel), {})
+    for prop in _SESSION_PROPS:
+        if prop in saved:
+            try:
+                setattr(excel, prop, saved[prop])
+            except Exception:
+                pass
@@ -11,6 +11,7 @@ ABD_DB_NAME = "global_associate_base_data"
 REGIONAL_TABLE = "employee_regional_details"
 SALARY_TABLE = "salary_data"
 CONSOLIDATION_TABLE = "consolidation"
+ALLOCATED_SALARY_TABLE = "allocated_salary"
 PMR_TABLE = "pmr_project_managers"
 ABD_TABLE_NAME = "associate_base_data"
 
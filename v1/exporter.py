@@ -1,85 +1,139 @@
 # exporter.py
 
+import tempfile
+
 import pandas as pd
 import config
 
+# Rows fetched per read_sql chunk; keeps peak memory proportional to a
+# chunk instead of the whole consolidation table
+EXPORT_CHUNK_SIZE = 50000
+
 
 def generate_final_report(connection, output_excel_path):
     """
     Queries the database for the final consolidated data and anomalies,
     then exports them to a formatted Excel file with two sheets.
+
+    The consolidation table is streamed in chunks and appended to the
+    sheet as it arrives, so the report never holds more than one chunk
+    (plus the small anomaly/ER_NIC slices) in memory.
     """
     print("\nGenerating final Excel report...")
 
     try:
-        # --- Query 1: Get all consolidated data ---
+        # --- Query 1: Stream all consolidated data in chunks ---
         consolidation_query = f"SELECT * FROM {config.CONSOLIDATION_TABLE} ORDER BY fiscal_year, Month"
-        df_consolidation = pd.read_sql(consolidation_query, connection)
-
-        # ▼▼▼ THIS IS THE NEW LINE ▼▼▼
-        # Filter out any rows where there is no salary data
-        df_consolidation.dropna(subset=['GROSS_PAY'], inplace=True)
-
-        print(f"  - Found {len(df_consolidation)} rows with Gross Pay data for the consolidation sheet.")
 
         # --- Query 2: Get anomalies (missing PMR details) ---
         anomalies_query = f"""
-            SELECT DISTINCT 
-                fiscal_year, 
-                PROJECT_ID 
-            FROM {config.CONSOLIDATION_TABLE} 
-            WHERE PGM_MANAGER_EMAIL IS NULL 
-              AND PROJECT_ID IS NOT NULL 
-              AND PROJECT_ID != '' 
+            SELECT DISTINCT
+                fiscal_year,
+                PROJECT_ID
+            FROM {config.CONSOLIDATION_TABLE}
+            WHERE PGM_MANAGER_EMAIL IS NULL
+              AND PROJECT_ID IS NOT NULL
+              AND PROJECT_ID != ''
             ORDER BY fiscal_year, PROJECT_ID
         """
-        df_anomalies = pd.read_sql(anomalies_query, connection)
-        print(f"  - Found {len(df_anomalies)} unique project IDs with missing manager emails.")
-
-        # --- Prepare the optional ER_NIC_SUM DataFrame ---
-        has_er_nic_sum_data = 'ER_NIC_SUM' in df_consolidation.columns and df_consolidation['ER_NIC_SUM'].notna().any()
-
-        df_er_nic = None
-        if has_er_nic_sum_data:
-            df_er_nic = df_consolidation[['fiscal_year', 'Month', 'EMPLID', 'GROSS_PAY', 'ER_NIC_SUM']].copy()
-            df_er_nic.dropna(subset=['ER_NIC_SUM'], inplace=True)
-            print(f"  - Found {len(df_er_nic)} rows with ER_NIC_SUM data for the new sheet.")
-
-        # --- NEW: Create a version of the main DataFrame for export without the ER_NIC_SUM column ---
-        df_consolidation_export = df_consolidation.copy()
-        if 'ER_NIC_SUM' in df_consolidation_export.columns:
-            df_consolidation_export = df_consolidation_export.drop(columns=['ER_NIC_SUM'])
+        # The anomaly set is small and already shaped by the query, so it
+        # goes straight from the cursor to the sheet without a DataFrame
+        # round-trip and its dtype inference
+        cursor = connection.cursor()
+        cursor.execute(anomalies_query)
+        anomaly_rows = cursor.fetchall()
+        anomaly_cols = [d[0] for d in cursor.description]
+        cursor.close()
+        print(f"  - Found {len(anomaly_rows)} unique project IDs with missing manager emails.")
+
+        # Helper function to calculate max width for columns; the cell
+        # lengths are measured with vectorised string ops instead of a
+        # Python-level str()/len() per cell
+        def get_col_widths(dataframe):
+            return [max(int(dataframe[col].astype(str).str.len().max()) if len(dataframe) else 0,
+                        len(str(col))) + 2
+                    for col in dataframe.columns]
 
         # --- Write to Excel with formatting ---
-        with pd.ExcelWriter(output_excel_path, engine='xlsxwriter') as writer:
-            # Write the main sheets, using the modified DataFrame for consolidation
-            df_consolidation_export.to_excel(writer, sheet_name='Consolidated_Data', index=False)
-            df_anomalies.to_excel(writer, sheet_name='Anomalies_Missing_PMR', index=False)
-
-            # Conditionally write the ER_NIC_SUM sheet
-            if has_er_nic_sum_data and not df_er_nic.empty:
-                df_er_nic.to_excel(writer, sheet_name='ER_NIC_SUM_Details', index=False)
-
-            # Helper function to calculate max width for columns
-            def get_col_widths(dataframe):
-                return [max([len(str(s)) for s in dataframe[col].values] + [len(col)]) + 2 for col in dataframe.columns]
+        # constant_memory flushes each finished row to a temp file instead
+        # of holding every cell until close; the chunk loop already writes
+        # each sheet strictly top-to-bottom, which is all the mode needs.
+        # Column widths are safe to set afterwards: set_column is sheet
+        # metadata, not row data, and is written at workbook close.
+        with pd.ExcelWriter(output_excel_path, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True,
+                                                       'tmpdir': tempfile.gettempdir()}}) as writer:
+            consolidation_rows = 0
+            er_nic_rows = 0
+            consolidation_widths = []
+            er_nic_widths = []
+
+            for chunk in pd.read_sql(consolidation_query, connection, chunksize=EXPORT_CHUNK_SIZE):
+                # Filter out any rows where there is no salary data
+                chunk = chunk.dropna(subset=['GROSS_PAY'])
+                if chunk.empty:
+                    continue
+
+                # The export sheet omits the ER_NIC_SUM column; its rows get
+                # their own query-driven sheet below
+                if 'ER_NIC_SUM' in chunk.columns:
+                    chunk = chunk.drop(columns=['ER_NIC_SUM'])
+
+                chunk.to_excel(writer, sheet_name='Consolidated_Data', index=False,
+                               header=not consolidation_rows,
+                               startrow=consolidation_rows + (1 if consolidation_rows else 0))
+                consolidation_widths = _merge_widths(consolidation_widths, get_col_widths(chunk))
+                consolidation_rows += len(chunk)
+
+            print(f"  - Found {consolidation_rows} rows with Gross Pay data for the consolidation sheet.")
+
+            # The ER_NIC_SUM sheet filters in SQL, so NULL rows are skipped
+            # server-side instead of being fetched and dropped in pandas
+            er_nic_query = f"""
+                SELECT fiscal_year, Month, EMPLID, GROSS_PAY, ER_NIC_SUM
+                FROM {config.CONSOLIDATION_TABLE}
+                WHERE ER_NIC_SUM IS NOT NULL AND GROSS_PAY IS NOT NULL
+                ORDER BY fiscal_year, Month
+            """
+            for chunk in pd.read_sql(er_nic_query, connection, chunksize=EXPORT_CHUNK_SIZE):
+                if chunk.empty:
+                    continue
+                chunk.to_excel(writer, sheet_name='ER_NIC_SUM_Details', index=False,
+                               header=not er_nic_rows, startrow=er_nic_rows + (1 if er_nic_rows else 0))
+                er_nic_widths = _merge_widths(er_nic_widths, get_col_widths(chunk))
+                er_nic_rows += len(chunk)
+            if er_nic_rows:
+                print(f"  - Found {er_nic_rows} rows with ER_NIC_SUM data for the new sheet.")
+
+            worksheet_anomalies = writer.book.add_worksheet('Anomalies_Missing_PMR')
+            worksheet_anomalies.write_row(0, 0, anomaly_cols)
+            for row_idx, row in enumerate(anomaly_rows, 1):
+                worksheet_anomalies.write_row(row_idx, 0, row)
 
             # Format the main sheets
-            worksheet_consolidation = writer.sheets['Consolidated_Data']
-            for i, width in enumerate(get_col_widths(df_consolidation_export)):
-                worksheet_consolidation.set_column(i, i, width)
+            if 'Consolidated_Data' in writer.sheets:
+                worksheet_consolidation = writer.sheets['Consolidated_Data']
+                for i, width in enumerate(consolidation_widths):
+                    worksheet_consolidation.set_column(i, i, width)
 
-            worksheet_anomalies = writer.sheets['Anomalies_Missing_PMR']
-            for i, width in enumerate(get_col_widths(df_anomalies)):
+            for i, col in enumerate(anomaly_cols):
+                width = max([len(str(v[i])) for v in anomaly_rows] + [len(col)]) + 2
                 worksheet_anomalies.set_column(i, i, width)
 
             # Conditionally format the new sheet
-            if has_er_nic_sum_data and not df_er_nic.empty:
+            if er_nic_rows:
                 worksheet_er_nic = writer.sheets['ER_NIC_SUM_Details']
-                for i, width in enumerate(get_col_widths(df_er_nic)):
+                for i, width in enumerate(er_nic_widths):
                     worksheet_er_nic.set_column(i, i, width)
 
         print(f"\n✅ Final report successfully saved to:\n{output_excel_path}")
 
     except Exception as e:
-        print(f"\n❌ An error occurred while generating the Excel report: {e}")
\ No newline at end of file
+        print(f"\n❌ An error occurred while generating the Excel report: {e}")
+
+
+def _merge_widths(running, new):
+    """Elementwise max of per-column widths across chunks."""
+    if not running:
+        return new
+    return [max(a, b) for a, b in zip(running, new)]
@@ -1,22 +1,66 @@
 # file_preprocessor.py
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
-def preprocess_regional_file(file_path):
+
+def _build_month_pivot(date_val, group_df):
+    """
+    Builds the sorted pivot for one month's slice. Runs in a worker
+    process; only the month's group crosses the process boundary, never
+    the whole regional frame.
+    """
+    # observed=True keeps the categorical key columns from expanding the
+    # pivot to the full category cross-product
+    pivot = pd.pivot_table(group_df, index=['EMPLID','CURRENT WORK LOCATION','PROJECT ID', 'PROJECT DESCRIPTION', 'PROJECT TYPE', 'CONTRACT TYPE', 'CUST NAME', 'RUS STATUS'], values='TOTAL HOURS', aggfunc='sum', fill_value=0, observed=True).reset_index()
+    pivot = pivot.sort_values(by=['EMPLID', 'RUS STATUS', 'TOTAL HOURS'], ascending=[True, True, False])
+    return date_val, pivot
+
+
+def preprocess_regional_file(file_path, df=None):
+    """
+    Builds the per-month pivot sheets for a Regional workbook. Accepts an
+    already-read DataFrame so the workbook is only parsed once per year;
+    the pivots are still written back into the file for inspection.
+    Returns a {sheet_name: pivot_df} mapping for direct ingestion.
+    """
     print(f"Preprocessing {file_path} ...")
+    month_frames = {}
     try:
-        df = pd.read_excel(file_path)
-        def clean_project_id(pid):
-            stripped_id = str(pid).strip()
-            return stripped_id.lstrip('0') if stripped_id.isdigit() else stripped_id
-        if 'PROJECT ID' in df.columns: df['PROJECT ID'] = df['PROJECT ID'].apply(clean_project_id)
+        if df is None:
+            df = pd.read_excel(file_path)
+        if 'PROJECT ID' in df.columns:
+            # Strip leading zeros off numeric IDs vectorised, matching the
+            # cleaning the PMR importer does
+            pids = df['PROJECT ID'].astype(str).str.strip()
+            df['PROJECT ID'] = pids.mask(pids.str.isdigit(), pids.str.lstrip('0'))
+        # Dictionary-encode the low-cardinality grouping columns so the
+        # pivots hash small integer codes instead of full strings
+        for col in ['CURRENT WORK LOCATION', 'PROJECT TYPE', 'CONTRACT TYPE',
+                    'CUST NAME', 'RUS STATUS']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         df['UTILIZATION END DT'] = pd.to_datetime(df['UTILIZATION END DT'], errors='coerce')
-        unique_dates = sorted(df['UTILIZATION END DT'].dropna().unique())
+        # One hash pass over the frame instead of a full boolean scan per
+        # unique date
+        month_groups = df.groupby('UTILIZATION END DT', sort=True)
+        # Each month's pivot+sort is independent CPU-bound pandas work, so
+        # they build in parallel; the writer stays serial below because
+        # the workbook append is not thread-safe.
+        with ProcessPoolExecutor() as executor:
+            futures = [executor.submit(_build_month_pivot, date_val, group_df)
+                       for date_val, group_df in month_groups]
+            pivots = [future.result() for future in futures]
         with pd.ExcelWriter(file_path, mode='a', engine='openpyxl', if_sheet_exists='replace') as writer:
-            for date_val in tqdm(unique_dates, desc="Creating pivot sheets"):
-                filtered_df = df[df['UTILIZATION END DT'] == date_val]
-                pivot = pd.pivot_table(filtered_df, index=['EMPLID','CURRENT WORK LOCATION','PROJECT ID', 'PROJECT DESCRIPTION', 'PROJECT TYPE', 'CONTRACT TYPE', 'CUST NAME', 'RUS STATUS'], values='TOTAL HOURS', aggfunc='sum', fill_value=0).reset_index()
-                pivot = pivot.sort_values(by=['EMPLID', 'RUS STATUS', 'TOTAL HOURS'], ascending=[True, True, False])
-                writer.sheets.pop(pd.to_datetime(date_val).strftime("%b-%y"), None) # Remove sheet if it exists
-                pivot.to_excel(writer, sheet_name=pd.to_datetime(date_val).strftime("%b-%y"), index=False)
-    except Exception as e: print(f"An error occurred during preprocessing: {e}")
\ No newline at end of file
+            for date_val, pivot in tqdm(pivots, desc="Creating pivot sheets"):
+                sheet_name = pd.to_datetime(date_val).strftime("%b-%y")
+                writer.sheets.pop(sheet_name, None) # Remove sheet if it exists
+                pivot.to_excel(writer, sheet_name=sheet_name, index=False)
+                month_frames[sheet_name] = pivot
+    except Exception as e:
+        # Re-raise so the caller aborts before import_regional_details
+        # deletes the year's rows; returning an empty mapping here would
+        # let the import report success having loaded nothing.
+        print(f"An error occurred during preprocessing: {e}")
+        raise
+    return month_frames
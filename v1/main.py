@@ -2,6 +2,8 @@
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from tkinter import Tk, filedialog
 import config
 import db_operations
@@ -10,6 +12,40 @@ import exporter
 from file_preprocessor import preprocess_regional_file
 
 
+def process_fiscal_year(folder_selected, db_name, fiscal_year):
+    """Processes a single fiscal-year folder on its own MySQL connection."""
+    year_path = os.path.join(folder_selected, fiscal_year)
+    print(f"\n{'=' * 10} Processing Fiscal Year: {fiscal_year} {'=' * 10}")
+
+    # Each worker needs its own connection; MySQL connections are not
+    # safe to share between threads.
+    conn = db_operations.create_connection(config.DB_HOST, config.DB_USER, config.DB_PASSWORD, db_name)
+    if not conn:
+        return
+    try:
+        regional_file = os.path.join(year_path, config.REGIONAL_FILENAME)
+        salary_file = os.path.join(year_path, config.SALARY_FILENAME)
+        log_file = os.path.join(year_path, config.LOG_FILENAME)
+
+        if os.path.exists(regional_file):
+            # Read the workbook once; validation, pivoting and ingest all
+            # work off the same in-memory frame
+            df_regional = db_operations.load_regional_dataframe(regional_file)
+            month_frames = preprocess_regional_file(regional_file, df_regional)
+            db_operations.import_regional_details(conn, month_frames, fiscal_year)
+
+        if os.path.exists(salary_file):
+            salary_sheets = db_operations.load_salary_sheets(salary_file)
+            db_operations.import_salary_data(conn, salary_sheets, fiscal_year)
+
+        db_operations.consolidate_data(conn, log_file, fiscal_year)
+
+        # --- ADDED: Call the new function to backfill emails ---
+        db_operations.fill_missing_emails(conn, db_name, fiscal_year)
+    finally:
+        conn.close()
+
+
 def main():
     """Main function to drive the data processing pipeline."""
     Tk().withdraw()
@@ -49,11 +85,15 @@ def main():
         root_conn.close()
         return
 
-    pmr_files = [os.path.join(folder_selected, f) for f in os.listdir(folder_selected) if
-                 f.startswith("PMR_") and f.endswith(".xlsx")]
+    # Enumerate the project folder once; scandir avoids an extra stat per entry
+    with os.scandir(folder_selected) as it:
+        entries = list(it)
+    pmr_files = [e.path for e in entries if
+                 e.is_file() and e.name.startswith("PMR_") and e.name.endswith(".xlsx")]
     if pmr_files:
         db_operations.create_pmr_table(pmr_conn)
-        db_operations.import_pmr_data(pmr_conn, pmr_files)
+        df_pmr = db_operations.load_pmr_dataframe(pmr_files)
+        db_operations.import_pmr_data(pmr_conn, df_pmr)
 
     pmr_conn.close()
     print(f"Connection to global PMR database '{config.PMR_DB_NAME}' closed.")
@@ -68,28 +108,14 @@ def main():
 
     db_operations.create_account_tables(conn)
 
-    year_folders = [d for d in os.listdir(folder_selected) if
-                    os.path.isdir(os.path.join(folder_selected, d)) and d.isdigit()]
-
-    for fiscal_year in sorted(year_folders):
-        year_path = os.path.join(folder_selected, fiscal_year)
-        print(f"\n{'=' * 10} Processing Fiscal Year: {fiscal_year} {'=' * 10}")
-
-        regional_file = os.path.join(year_path, config.REGIONAL_FILENAME)
-        salary_file = os.path.join(year_path, config.SALARY_FILENAME)
-        log_file = os.path.join(year_path, config.LOG_FILENAME)
-
-        if os.path.exists(regional_file):
-            preprocess_regional_file(regional_file)
-            db_operations.import_regional_details(conn, regional_file, fiscal_year)
-
-        if os.path.exists(salary_file):
-            db_operations.import_salary_data(conn, salary_file, fiscal_year)
-
-        db_operations.consolidate_data(conn, log_file, fiscal_year)
+    year_folders = [e.name for e in entries if e.is_dir() and e.name.isdigit()]
 
-        # --- ADDED: Call the new function to backfill emails ---
-        db_operations.fill_missing_emails(conn, db_name, fiscal_year)
+    # Fiscal years are disjoint row sets, so process them in parallel.
+    # The work is I/O-bound (Excel reads + MySQL), so threads are enough.
+    if year_folders:
+        with ThreadPoolExecutor(max_workers=min(4, len(year_folders))) as executor:
+            list(executor.map(partial(process_fiscal_year, folder_selected, db_name),
+                              sorted(year_folders)))
 
     if year_folders:
         output_excel_path = os.path.join(folder_selected, f"{db_name}_final_report.xlsx")
@@ -1,18 +1,21 @@
 # validator.py
 import os, pandas as pd, config
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
+def missing_columns(df, expected_columns):
+    """Returns the expected columns that are absent from an already-read DataFrame."""
+    actual_columns = {str(col).strip().upper() for col in df.columns}
+    return [col for col in expected_columns if col.upper() not in actual_columns]
+
 def _verify_excel_columns(file_path, expected_columns, sheet_name=0):
-    missing_cols = []
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
-        actual_columns = {col.strip().upper() for col in df.columns}
-        for expected_col in expected_columns:
-            if expected_col.upper() not in actual_columns:
-                missing_cols.append(expected_col)
+        # Only the header row matters here; nrows=0 keeps calamine from
+        # parsing the data rows just to throw them away
+        df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=0, engine='calamine')
     except Exception as e:
         return [f"Could not read file or sheet: {e}"]
-    return missing_cols
+    return missing_columns(df, expected_columns)
 
 def validate_project_structure(root_folder):
     print("\n🔍 Starting validation process...")
@@ -27,20 +30,25 @@ def validate_project_structure(root_folder):
         for folder in year_folders:
             validation_tasks.extend([{'type': 'file_check', 'folder': folder, 'filename': config.REGIONAL_FILENAME}, {'type': 'file_check', 'folder': folder, 'filename': config.SALARY_FILENAME}])
 
-    with tqdm(total=len(validation_tasks), desc="Validating files") as pbar:
-        for task in validation_tasks:
-            pbar.set_postfix_str(f"Checking {task.get('file') or task.get('filename')}", refresh=True)
-            if task['type'] == 'pmr_schema':
-                missing = _verify_excel_columns(os.path.join(root_folder, task['file']), config.PMR_COLUMNS)
-                if missing: errors.append(f"In {task['file']}: Missing columns - {', '.join(missing)}")
-            elif task['type'] == 'file_check':
-                file_path = os.path.join(root_folder, task['folder'], task['filename'])
-                if not os.path.exists(file_path): errors.append(f"In {task['folder']}: File '{task['filename']}' is missing.")
-                else:
-                    expected_cols = config.REGIONAL_COLUMNS if 'Regional' in task['filename'] else config.SALARY_COLUMNS
-                    missing = _verify_excel_columns(file_path, expected_cols)
-                    if missing: errors.append(f"In {task['folder']}/{task['filename']}: Missing columns - {', '.join(missing)}")
-            pbar.update(1)
+    def run_task(task):
+        if task['type'] == 'pmr_schema':
+            missing = _verify_excel_columns(os.path.join(root_folder, task['file']), config.PMR_COLUMNS)
+            if missing: return f"In {task['file']}: Missing columns - {', '.join(missing)}"
+        elif task['type'] == 'file_check':
+            file_path = os.path.join(root_folder, task['folder'], task['filename'])
+            if not os.path.exists(file_path): return f"In {task['folder']}: File '{task['filename']}' is missing."
+            expected_cols = config.REGIONAL_COLUMNS if 'Regional' in task['filename'] else config.SALARY_COLUMNS
+            missing = _verify_excel_columns(file_path, expected_cols)
+            if missing: return f"In {task['folder']}/{task['filename']}: Missing columns - {', '.join(missing)}"
+        return None
+
+    # Each task reads a different workbook, so they validate in parallel;
+    # the parse work releases the GIL inside calamine/pandas
+    if validation_tasks:
+        with ThreadPoolExecutor(max_workers=min(8, len(validation_tasks))) as executor:
+            results = list(tqdm(executor.map(run_task, validation_tasks),
+                                total=len(validation_tasks), desc="Validating files"))
+        errors.extend(error for error in results if error)
 
     print("\n" + "="*25 + "\n   Validation Summary\n" + "="*25)
     if errors:
@@ -1,5 +1,5 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog
 import os
@@ -18,7 +18,10 @@ def reshape_payroll_data(file_path, fiscal_year_start):
     """
     try:
         # Read the Excel file, specifying that the first two rows are the header.
-        df = pd.read_excel(file_path, header=[0, 1])
+        # calamine parses the sheet in native code instead of building
+        # openpyxl's full workbook DOM; the two-row header is still
+        # assembled by pandas.
+        df = pd.read_excel(file_path, header=[0, 1], engine='calamine')
 
         # Identify and filter out the summary columns at the end of the sheet.
         # We define the valid months we expect to see.
@@ -56,17 +59,23 @@ def reshape_payroll_data(file_path, fiscal_year_start):
         df.rename(columns={'EMPLID': 'EMPLID'}, inplace=True)
         df.set_index('EMPLID', inplace=True)
 
-        # Stack the DataFrame. This pivots the months into a new index level.
-        # Added future_stack=True to silence the warning.
-        df_stacked = df.stack(level=0, future_stack=True)
+        # The layout is a fixed (employee x month x metric) tensor, so the
+        # wide-to-long step is a plain NumPy reshape: normalise the columns
+        # to month-major, metric-minor order in fiscal sequence, flatten the
+        # block, and rebuild the long frame directly. This skips stack()'s
+        # MultiIndex construction and reindex while emitting the same
+        # pre-grouped employee/month order.
+        metrics = list(dict.fromkeys(df.columns.get_level_values(1)))
+        df = df.reindex(columns=pd.MultiIndex.from_product([valid_months, metrics]))
+        flat = df.to_numpy().reshape(-1, len(metrics))
 
-        # Reset the index to turn the stacked levels (EMPLID, Month) back into columns
-        df_stacked.reset_index(inplace=True)
+        df_stacked = pd.DataFrame(flat, columns=metrics)
+        df_stacked.insert(0, 'Month', np.tile(valid_months, len(df)))
+        df_stacked.insert(0, 'EMPLID', np.repeat(df.index.to_numpy(), len(valid_months)))
 
         # --- MODIFIED SECTION ---
         # Rename the columns as requested by the user
         df_stacked.rename(columns={
-            'level_1': 'Month',
             'Sum of Total pay': 'gross pay',
             'Sum of ER NIC': 'ER_NIC_SUM' # Changed this line
         }, inplace=True)
@@ -83,18 +92,24 @@ def reshape_payroll_data(file_path, fiscal_year_start):
             'Jan': fiscal_year_start + 1, 'Feb': fiscal_year_start + 1, 'Mar': fiscal_year_start + 1
         }
 
-        def convert_month_to_date(month_str):
-            year = month_to_year.get(month_str.strip(), 9999)  # Default to a bad year if not found
-            date_str = f"{month_str.strip()} {year}"
-            return datetime.strptime(date_str, "%b %Y")
-
-        df_stacked['Month'] = df_stacked['Month'].apply(convert_month_to_date)
-
-        # Format the 'Month' column to show only the date, not the time
-        df_stacked['Month'] = pd.to_datetime(df_stacked['Month']).dt.date
-
-        # Sort the data by Month and then by Employee ID
-        df_sorted = df_stacked.sort_values(by=['Month', 'EMPLID'])
+        month_to_num = {month: num for num, month in
+                        enumerate(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], start=1)}
+
+        # Convert month names to dates with two vectorised dict lookups and
+        # one C-level datetime assembly, instead of a strptime call per row
+        # (the column only ever holds the twelve fiscal month names).
+        months = df_stacked['Month'].str.strip()
+        df_stacked['Month'] = pd.to_datetime({
+            'year': months.map(month_to_year),
+            'month': months.map(month_to_num),
+            'day': 1,
+        }).dt.date
+
+        # Sort the data by Month only; a stable sort on the twelve date
+        # values keeps the stacked order within each month, replacing the
+        # full two-key lexsort of the long frame
+        df_sorted = df_stacked.sort_values(by='Month', kind='stable')
 
         # Select, reorder the final columns, and drop rows where there is no pay data
         final_df = df_sorted[['EMPLID', 'Month', 'gross pay', 'ER_NIC_SUM']].dropna(subset=['gross pay']) # Changed this line
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
@@ -15,8 +16,9 @@ def process_salary_data(input_file_path, output_file_path):
     """
     try:
         # Read the Excel file, assuming data is on the first sheet.
-        # The header is on the second row (index 1).
-        df = pd.read_excel(input_file_path, header=1, sheet_name=0)
+        # The header is on the second row (index 1). calamine streams the
+        # sheet in native code instead of building openpyxl's workbook DOM.
+        df = pd.read_excel(input_file_path, header=1, sheet_name=0, engine='calamine')
 
         # The first column is 'Row Labels' which contains employee IDs.
         # Let's clean up the column names, as they might have extra spaces.
@@ -38,38 +40,36 @@ def process_salary_data(input_file_path, output_file_path):
         er_nic_indices = [5 + i * 5 for i in range(12)]
 
         # --- Consolidate all monthly data ---
-        all_months_data = []
-
+        # Work out which months actually have both columns in the sheet
+        valid_months = []
         for i, month_name in enumerate(months):
-            pay_col_index = total_pay_indices[i]
-            nic_col_index = er_nic_indices[i]
-
-            # Check if columns exist before accessing them
-            if pay_col_index < len(df.columns) and nic_col_index < len(df.columns):
-                # Extract data for the current month
-                month_df = df.iloc[:, [0, pay_col_index, nic_col_index]].copy()
-                # Rename columns to the new requested names
-                month_df.columns = ['EMPLID', 'Gross Pay', 'ER_NIC_SUM']
-
-                # Add the month column with the date value
-                month_df['Month'] = fiscal_year_map[month_name]
-
-                all_months_data.append(month_df)
+            if total_pay_indices[i] < len(df.columns) and er_nic_indices[i] < len(df.columns):
+                valid_months.append(i)
             else:
                 print(f"Warning: Columns for {month_name} not found. Skipping.")
 
-        # Combine all monthly dataframes into a single one
-        consolidated_df = pd.concat(all_months_data, ignore_index=True)
-
-        # Clean up the final dataframe
-        consolidated_df.dropna(subset=['EMPLID'], inplace=True)
-        consolidated_df = consolidated_df[consolidated_df['EMPLID'] != 'Grand Total']
-
-        # Reorder columns to the desired format
-        consolidated_df = consolidated_df[['EMPLID', 'Month', 'Gross Pay', 'ER_NIC_SUM']]
-
-        # Save the consolidated dataframe to a new Excel file.
-        consolidated_df.to_excel(output_file_path, sheet_name='Total', index=False)
+        # Drop total rows once up front, before the data is replicated
+        # twelve-fold
+        emplid_col = df.iloc[:, 0]
+        df = df[emplid_col.notna() & (emplid_col != 'Grand Total')]
+
+        # Stack the (employee x month) pay and NIC blocks with plain NumPy
+        # reshapes instead of twelve sliced copies plus a concat; the
+        # transpose keeps the month-major row order concat produced.
+        pay = df.iloc[:, [total_pay_indices[i] for i in valid_months]].to_numpy()
+        nic = df.iloc[:, [er_nic_indices[i] for i in valid_months]].to_numpy()
+        month_dates = [fiscal_year_map[months[i]] for i in valid_months]
+
+        consolidated_df = pd.DataFrame({
+            'EMPLID': np.tile(df.iloc[:, 0].to_numpy(), len(valid_months)),
+            'Month': np.repeat(month_dates, len(df)),
+            'Gross Pay': pay.T.ravel(),
+            'ER_NIC_SUM': nic.T.ravel(),
+        })
+
+        # Save the consolidated dataframe to a new Excel file. xlsxwriter
+        # writes a plain data sheet far faster than the openpyxl default.
+        consolidated_df.to_excel(output_file_path, sheet_name='Total', index=False, engine='xlsxwriter')
         print(f"Successfully created consolidated file at: {output_file_path}")
 
     except FileNotFoundError:
@@ -61,6 +61,10 @@ CONFIG = {
         "salary": "salary",
         "consolidated": "consolidated",
         "pmr_managers": "pmr_project_managers",
+        # Optional single physical ABD table (see --migrate-abd); when it
+        # holds every monthly table's rows the per-run UNION ALL rebuild
+        # is skipped entirely.
+        "abd_all": "abd_all",
     },
 
     # Column mapping - change if your columns have different names
@@ -109,6 +113,9 @@ CONFIG = {
     # Behavior flags
     "behavior": {
         "dry_run": False,  # set True to print SQL and exit
+        # Regional emplids per INSERT..SELECT batch; keeps each InnoDB
+        # transaction (and its undo/redo footprint) bounded
+        "insert_batch_emplids": 10000,
     },
 }
 
@@ -165,16 +172,20 @@ def list_abd_tables(conn, abd_db: str, pattern: str) -> List[str]:
     return [r[0] for r in rows]
 
 
-def get_table_columns(conn, db: str, table: str) -> List[str]:
+def get_abd_table_columns(conn, db: str, pattern: str) -> Dict[str, set]:
+    """Return {table_name: set(columns)} for every ABD table in one query,
+    instead of a round-trip to information_schema per monthly table."""
     cur = conn.cursor()
     sql = (
-        "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
-        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+        "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME REGEXP %s"
     )
-    cur.execute(sql, (db, table))
-    cols = [r[0] for r in cur.fetchall()]
+    cur.execute(sql, (db, pattern))
+    columns_by_table: Dict[str, set] = {}
+    for table, column in cur.fetchall():
+        columns_by_table.setdefault(table, set()).add(column)
     cur.close()
-    return cols
+    return columns_by_table
 
 
 def build_abd_union_query(conn, cfg: Dict) -> str:
@@ -185,13 +196,12 @@ def build_abd_union_query(conn, cfg: Dict) -> str:
     pattern = cfg.get("abd_table_pattern")
     mapping = cfg["columns"]["abd"]
 
-    tables = list_abd_tables(conn, abd_db, pattern)
-    if not tables:
+    columns_by_table = get_abd_table_columns(conn, abd_db, pattern)
+    if not columns_by_table:
         raise RuntimeError(f"No ABD tables found in {abd_db} matching pattern {pattern}")
 
     selects = []
-    for t in tables:
-        cols = set(get_table_columns(conn, abd_db, t))
+    for t, cols in sorted(columns_by_table.items()):
         # mandatory join keys in abd
         if mapping["emplid"] not in cols or mapping["project_id"] not in cols:
             logger.warning("Skipping table %s because it doesn't have required keys (%s, %s)", t, mapping["emplid"], mapping["project_id"])
@@ -240,15 +250,106 @@ def create_temp_abd_combined(conn, cfg: Dict, dry_run=False) -> None:
         logger.info("DRY RUN: would execute DROP and CREATE TEMPORARY TABLE statements.")
         logger.info(drop_sql)
         logger.info(create_sql[:1000] + "\n... (truncated)")
+        logger.info(f"ALTER TABLE `{tmp_table}` ADD INDEX idx_abd_epm (emplid, project_id, abd_month);")
         cur.close()
         return
 
     cur.execute(drop_sql)
     cur.execute(create_sql)
+    # Index the three join keys so the final insert probes abd_combined
+    # instead of scanning the whole heap once per regional row. Temporary
+    # tables accept secondary indexes like any InnoDB table.
+    index_sql = f"ALTER TABLE `{tmp_table}` ADD INDEX idx_abd_epm (emplid, project_id, abd_month);"
+    cur.execute(index_sql)
     conn.commit()
     cur.close()
 
 
+def migrate_abd_all(conn, cfg: Dict) -> None:
+    """
+    One-time migration: folds every monthly MM_YYYY table into a single
+    partitioned `abd_all` table keyed by abd_month. Already-loaded months
+    are skipped, so the command is safe to rerun as new months arrive.
+    """
+    abd_db = cfg["databases"]["abd"]
+    abd_all = cfg["tables"]["abd_all"]
+    full = quote_db_table(abd_db, abd_all)
+    mapping = cfg["columns"]["abd"]
+
+    cur = conn.cursor()
+    cur.execute(f"""
+CREATE TABLE IF NOT EXISTS {full} (
+  `emplid` VARCHAR(64),
+  `project_id` VARCHAR(128),
+  `job_code_description` TEXT,
+  `band` VARCHAR(128),
+  `technicalbsgsalessupport` TEXT,
+  `project_type_desc` TEXT,
+  `project_pricing_type` TEXT,
+  `abd_month` CHAR(7) NOT NULL,
+  KEY `idx_abd_all_epm` (`emplid`, `project_id`, `abd_month`)
+) ENGINE=InnoDB
+PARTITION BY KEY(`abd_month`) PARTITIONS 24;
+""")
+    cur.execute(f"SELECT DISTINCT `abd_month` FROM {full}")
+    loaded = {r[0] for r in cur.fetchall()}
+
+    columns_by_table = get_abd_table_columns(conn, abd_db, cfg["abd_table_pattern"])
+    logical_cols = ["job_code_description", "band", "technicalbsgsalessupport",
+                    "project_type_desc", "project_pricing_type"]
+    for t, cols in sorted(columns_by_table.items()):
+        if t in loaded:
+            logger.info("Month %s already present in %s; skipping.", t, abd_all)
+            continue
+        if mapping["emplid"] not in cols or mapping["project_id"] not in cols:
+            logger.warning("Skipping table %s: missing key columns.", t)
+            continue
+        parts = [f"`{mapping['emplid']}`", f"`{mapping['project_id']}`"]
+        for logical_col in logical_cols:
+            actual = mapping.get(logical_col)
+            parts.append(f"`{actual}`" if actual and actual in cols else "NULL")
+        parts.append(f"'{t.replace(chr(39), chr(92) + chr(39))}'")
+        cur.execute(
+            f"INSERT INTO {full} (emplid, project_id, {', '.join(logical_cols)}, abd_month) "
+            f"SELECT {', '.join(parts)} FROM {quote_db_table(abd_db, t)}"
+        )
+        conn.commit()
+        logger.info("Loaded %s into %s (%d rows).", t, abd_all, cur.rowcount)
+    cur.close()
+
+
+def prepare_abd_source(conn, cfg: Dict, dry_run: bool = False) -> str:
+    """
+    Returns the table the final insert should join for ABD attributes:
+    `abd_all` when the migrated table exists and covers every monthly
+    table, otherwise the per-run temporary union table.
+    """
+    abd_db = cfg["databases"]["abd"]
+    abd_all = cfg["tables"].get("abd_all")
+    if abd_all:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (abd_db, abd_all),
+        )
+        exists = cur.fetchone()[0] > 0
+        if exists:
+            cur.execute(f"SELECT DISTINCT `abd_month` FROM {quote_db_table(abd_db, abd_all)}")
+            loaded = {r[0] for r in cur.fetchall()}
+            monthly = set(get_abd_table_columns(conn, abd_db, cfg["abd_table_pattern"]))
+            cur.close()
+            if monthly and monthly <= loaded:
+                logger.info("Using migrated ABD table %s.%s; skipping UNION rebuild.", abd_db, abd_all)
+                return quote_db_table(abd_db, abd_all)
+            logger.info("%s.%s is missing months %s; falling back to UNION rebuild.",
+                        abd_db, abd_all, sorted(monthly - loaded))
+        else:
+            cur.close()
+    create_temp_abd_combined(conn, cfg, dry_run=dry_run)
+    return "`abd_combined`"
+
+
 def create_consolidated_table(conn, cfg: Dict, rebuild: bool = False) -> None:
     db = cfg["databases"]["uk"]
     tbl = cfg["tables"]["consolidated"]
@@ -296,9 +397,9 @@ CREATE TABLE IF NOT EXISTS {full} (
     cur.close()
 
 
-def build_final_insert_sql(cfg: Dict) -> str:
+def build_final_insert_sql(cfg: Dict, where_clause: str = "", abd_source: str = "`abd_combined`",
+                           parametrized: bool = False) -> str:
     uk_db = cfg["databases"]["uk"]
-    abd_tmp = "abd_combined"
     pmr_db = cfg["databases"]["pmr"]
 
     # column names from mapping
@@ -314,8 +415,12 @@ def build_final_insert_sql(cfg: Dict) -> str:
 
     # Build expressions with DATE_FORMAT to produce MM_YYYY from dates in regional and salary
     # We qualify columns with table aliases (r, s) to avoid ambiguity in JOINs.
-    regional_month_expr = f"DATE_FORMAT(r.`{rmap['utilization_end_dt']}`, '%m_%Y')"
-    salary_month_expr = f"DATE_FORMAT(s.`{smap['month']}`, '%m_%Y')"
+    # When the statement will be executed with parameters, mysql-connector
+    # interpolates them with %-formatting over the whole statement, so the
+    # literal percents in the format string must be doubled to survive it.
+    month_fmt = "%%m_%%Y" if parametrized else "%m_%Y"
+    regional_month_expr = f"DATE_FORMAT(r.`{rmap['utilization_end_dt']}`, '{month_fmt}')"
+    salary_month_expr = f"DATE_FORMAT(s.`{smap['month']}`, '{month_fmt}')"
 
     select = f"""
 SELECT
@@ -338,13 +443,15 @@ FROM {regional} r
 LEFT JOIN {salary} s
   ON s.`{smap['emplid']}` = r.`{rmap['emplid']}`
   AND {salary_month_expr} = {regional_month_expr}
-LEFT JOIN `{abd_tmp}` a
+LEFT JOIN {abd_source} a
   ON a.emplid = r.`{rmap['emplid']}`
   AND a.project_id = r.`{rmap['project_id']}`
   AND a.abd_month = {regional_month_expr}
 LEFT JOIN {pmr} pm
   ON pm.`{pmap['project_id']}` = r.`{rmap['project_id']}`
 """
+    if where_clause:
+        select += f"WHERE {where_clause}\n"
 
     # final insert - support configurable insert modes (insert / ignore / replace / on_duplicate)
     cols = ['`EMPLID`','`Month`','`GROSS_PAY`','`JOB_CODE_DESCRIPTION`','`BAND`','`technicalbsgsalessupport`','`CURRENT_WORK_LOCATION`','`PROJECT_ID`','`PROJECT_DESCRIPTION`','`project_type_desc`','`project_pricing_type`','`contract_type`','`cust_name`','`PGM_MANAGER_NAME`','`PGM_MANAGER_EMAIL`']
@@ -375,33 +482,81 @@ LEFT JOIN {pmr} pm
         verb = 'INSERT INTO'
         suffix = ''
 
-    insert_sql = f"{verb} {consolidated_full} ({', '.join(cols)})
-{select}{suffix};"
+    insert_sql = f"{verb} {consolidated_full} ({', '.join(cols)})\n{select}{suffix};"
     return insert_sql
 
 
 def run_consolidation(cfg: Dict, rebuild: bool = False, dry_run: bool = False) -> None:
     conn = get_connection(cfg)
     try:
-        # 1. Create temporary abd_combined
-        create_temp_abd_combined(conn, cfg, dry_run=dry_run)
+        # 1. Resolve the ABD source (migrated abd_all or temporary union)
+        abd_source = prepare_abd_source(conn, cfg, dry_run=dry_run)
 
         # 2. Ensure consolidated table
         create_consolidated_table(conn, cfg, rebuild=rebuild)
 
         # 3. Build insert SQL
-        insert_sql = build_final_insert_sql(cfg)
-
         if dry_run:
+            insert_sql = build_final_insert_sql(cfg, abd_source=abd_source)
             logger.info("DRY RUN - Final INSERT SQL (truncated):\n%s\n...", insert_sql[:2000])
             return
 
         logger.info("Starting insertion into consolidated table (this may take time).")
         cur = conn.cursor()
-        # Execute the insert
-        cur.execute(insert_sql)
-        conn.commit()
-        logger.info("Inserted %d rows into consolidated.", cur.rowcount if hasattr(cur, 'rowcount') else -1)
+
+        # Keyset-paginate the load on regional emplid so each batch commits
+        # its own bounded transaction instead of one giant undo/redo blob,
+        # and a failed run can restart from the last committed boundary.
+        uk_db = cfg["databases"]["uk"]
+        rmap = cfg["columns"]["regional"]
+        regional_full = quote_db_table(uk_db, cfg["tables"]["regional"])
+        batch_emplids = cfg.get("behavior", {}).get("insert_batch_emplids", 10000)
+
+        cur.execute(f"SELECT DISTINCT `{rmap['emplid']}` FROM {regional_full} ORDER BY `{rmap['emplid']}`")
+        emplids = [row[0] for row in cur.fetchall()]
+        # NULL sorts first in MySQL; keep it out of the keyset bounds and
+        # fold those rows into the first batch, since the range predicates
+        # below would silently drop them otherwise.
+        has_null_emplid = bool(emplids) and emplids[0] is None
+        if has_null_emplid:
+            emplids = emplids[1:]
+
+        # Bulk-load session tuning for the duration of the inserts
+        cur.execute("SET SESSION transaction_isolation = 'READ-COMMITTED'")
+        cur.execute("SET SESSION unique_checks = 0")
+        cur.execute("SET SESSION foreign_key_checks = 0")
+
+        total_rows = 0
+        try:
+            batches = []
+            for start in range(0, len(emplids), batch_emplids):
+                upper = emplids[min(start + batch_emplids, len(emplids)) - 1]
+                lower = emplids[start - 1] if start else None
+                if lower is None:
+                    clause = f"r.`{rmap['emplid']}` <= %s"
+                    params = (upper,)
+                else:
+                    clause = f"r.`{rmap['emplid']}` > %s AND r.`{rmap['emplid']}` <= %s"
+                    params = (lower, upper)
+                batches.append((clause, params))
+            if has_null_emplid:
+                if batches:
+                    clause, params = batches[0]
+                    batches[0] = (f"({clause} OR r.`{rmap['emplid']}` IS NULL)", params)
+                else:
+                    batches.append((f"r.`{rmap['emplid']}` IS NULL", ()))
+            for clause, params in batches:
+                cur.execute(build_final_insert_sql(cfg, where_clause=clause, abd_source=abd_source,
+                                                   parametrized=True), params)
+                total_rows += cur.rowcount if cur.rowcount is not None else 0
+                conn.commit()
+                logger.info("Committed batch up to emplid %s (%d rows so far).",
+                            params[-1] if params else "NULL", total_rows)
+        finally:
+            cur.execute("SET SESSION unique_checks = 1")
+            cur.execute("SET SESSION foreign_key_checks = 1")
+
+        logger.info("Inserted %d rows into consolidated.", total_rows)
         cur.close()
 
     finally:
@@ -416,6 +571,7 @@ if __name__ == '__main__':
     parser.add_argument('--rebuild', action='store_true', help='Drop and recreate consolidated table before inserting')
     parser.add_argument('--dry-run', action='store_true', help='Only print SQLs and exit')
     parser.add_argument('--prompt-pass', action='store_true', help='Prompt for MySQL password instead of using config')
+    parser.add_argument('--migrate-abd', action='store_true', help='Fold the monthly ABD tables into a single partitioned abd_all table and exit')
 
     args = parser.parse_args()
 
@@ -423,6 +579,14 @@ if __name__ == '__main__':
         CONFIG['mysql']['password'] = None
 
     try:
+        if args.migrate_abd:
+            conn = get_connection(CONFIG)
+            try:
+                migrate_abd_all(conn, CONFIG)
+            finally:
+                conn.close()
+            logger.info("ABD migration finished.")
+            sys.exit(0)
         run_consolidation(CONFIG, rebuild=args.rebuild, dry_run=args.dry_run)
         if args.dry_run:
             logger.info("Dry run complete. No changes were made.")
@@ -26,19 +26,26 @@ try:
     cursor = cnx.cursor()
     print("Successfully connected to the database.")
 
+    # One information_schema scan replaces the SHOW TABLES + SHOW COLUMNS
+    # pair per table; only the actual renames cost further round-trips
+    placeholders = ", ".join(["%s"] * len(tables_to_check))
+    cursor.execute(
+        "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})",
+        [config['database']] + tables_to_check,
+    )
+    columns_by_table = {}
+    for table_name, column_name in cursor.fetchall():
+        columns_by_table.setdefault(table_name, set()).add(column_name.lower())
+
     # Loop through each table provided in the list
     for table_name in tables_to_check:
         try:
-            # Check if the table exists first
-            cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-            if not cursor.fetchone():
+            columns = columns_by_table.get(table_name)
+            if columns is None:
                 print(f"Table '{table_name}' not found. Skipping.")
                 continue
 
-            # Get the list of columns for the current table
-            cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
-            columns = [row[0].lower() for row in cursor.fetchall()]
-
             # Check if the correct column name already exists
             if correct_column_name in columns:
                 print(f"Table '{table_name}' already has the correct column '{correct_column_name}'. No action needed.")
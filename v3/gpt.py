@@ -1,8 +1,6 @@
 import mysql.connector
 from mysql.connector import Error
 import re
-from collections import defaultdict
-from datetime import datetime
 
 """
 Consolidator v3
@@ -50,22 +48,6 @@ def get_connection():
     )
 
 
-def month_key_from_dt(dt):
-    if not dt:
-        return None
-    if isinstance(dt, str):
-        # try parse common formats
-        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%Y/%m/%d"):
-            try:
-                dt = datetime.strptime(dt, fmt)
-                break
-            except ValueError:
-                continue
-        else:
-            return None
-    return dt.strftime("%m_%Y")
-
-
 # =======================
 # DATA LOADERS
 # =======================
@@ -75,58 +57,29 @@ def get_abd_tables(cur):
     return [r[0] for r in cur.fetchall() if re.match(r"^\d{2}_\d{4}$", r[0])]
 
 
-def load_regional(cur):
-    cur.execute(f"SELECT * FROM {DBS['uk']}.{TABLES['regional']}")
-    rows = cur.fetchall(); cols = cur.column_names
-    idx = {c: i for i, c in enumerate(cols)}
-    return rows, idx
-
-
-def load_salary(cur):
-    cur.execute(f"SELECT * FROM {DBS['uk']}.{TABLES['salary']}")
-    rows = cur.fetchall(); cols = cur.column_names
-    idx = {c: i for i, c in enumerate(cols)}
-    # Build map by (emplid, MM_YYYY)
-    sal_map = {}
-    for r in rows:
-        emplid = r[idx["emplid"]]
-        mkey = month_key_from_dt(r[idx["month"]])
-        sal_map[(emplid, mkey)] = float(r[idx["gross_pay"]]) if r[idx["gross_pay"]] is not None else None
-    return rows, idx, sal_map
-
-
-def load_pmr(cur):
-    cur.execute(f"SELECT * FROM {DBS['pmr']}.{TABLES['pmr']}")
-    rows = cur.fetchall(); cols = cur.column_names
-    idx = {c: i for i, c in enumerate(cols)}
-    # Map by PROJECT_ID
-    pmr_map = {}
-    for r in rows:
-        pmr_map[r[idx["PROJECT_ID"]]] = (
-            r[idx.get("PGM_MANAGER_NAME")],
-            r[idx.get("PGM_MANAGER_EMAIL")],
-        )
-    return rows, idx, pmr_map
+# Attribute columns pulled from each monthly ABD table, in the order the
+# consolidated insert consumes them
+ABD_ATTR_COLS = ("job_code_description", "band", "technicalbsgsalessupport",
+                 "project_type_desc", "project_pricing_type")
 
 
-def load_abd(cur):
+def create_abd_combined(cur):
+    """
+    Unions the monthly ABD tables into a temporary abd_combined table,
+    tagging each row with its source table name as the MM_YYYY month key,
+    so the final insert can join ABD attributes server-side.
+    """
     abd_tables = get_abd_tables(cur)
-    abd_map = {}
-    # For each MM_YYYY table, map (emplid, project_id, MM_YYYY) -> row dict
-    for t in abd_tables:
-        cur.execute(f"SELECT * FROM {DBS['abd']}.{t}")
-        rows = cur.fetchall(); cols = cur.column_names
-        idx = {c: i for i, c in enumerate(cols)}
-        for r in rows:
-            key = (r[idx.get("emplid")], r[idx.get("project_id")], t)
-            abd_map[key] = {
-                "job_code_description": r[idx.get("job_code_description")],
-                "band": r[idx.get("band")],
-                "technicalbsgsalessupport": r[idx.get("technicalbsgsalessupport")],
-                "project_type_desc": r[idx.get("project_type_desc")],
-                "project_pricing_type": r[idx.get("project_pricing_type")],
-            }
-    return abd_map
+    if not abd_tables:
+        raise RuntimeError(f"No MM_YYYY ABD tables found in {DBS['abd']}")
+    select_cols = ", ".join(("emplid", "project_id") + ABD_ATTR_COLS)
+    selects = [
+        f"SELECT {select_cols}, '{t}' AS abd_month FROM {DBS['abd']}.`{t}`"
+        for t in abd_tables
+    ]
+    cur.execute("DROP TEMPORARY TABLE IF EXISTS abd_combined")
+    cur.execute("CREATE TEMPORARY TABLE abd_combined AS (\n"
+                + "\nUNION ALL\n".join(selects) + "\n)")
 
 
 # =======================
@@ -162,62 +115,70 @@ def create_consolidated(cur):
 # CORE LOGIC
 # =======================
 
-def allocate_salary(regional_rows, reg_idx, salary_map):
-    """Return map of row_index -> allocated gross_pay so that total matches salary.
-    Allocation is per (emplid, month_key).
+# Month key shared by every join: the regional row's utilization month as MM_YYYY
+_REGIONAL_MONTH_EXPR = "DATE_FORMAT(r.utilization_end_dt, '%m_%Y')"
+
+
+def gross_pay_expr():
+    """SQL expression implementing the configured salary allocation mode."""
+    if GROSS_PAY_ALLOCATION == "first_only":
+        # All pay on one arbitrary row of the group, zero on the rest
+        return ("CASE WHEN s.gross_pay IS NULL THEN NULL "
+                "WHEN r.rn = 1 THEN s.gross_pay ELSE 0.0 END")
+    if GROSS_PAY_ALLOCATION == "split_equal":
+        return "s.gross_pay / g.cnt"
+    # split_by_hours (and the safety fallback): pro-rate by hours, with an
+    # equal split when the group logged no hours; NULL hours count as 0 so
+    # such a row gets a 0.0 share rather than poisoning the product to NULL
+    return ("CASE WHEN g.total_hours > 0 "
+            "THEN s.gross_pay * (COALESCE(r.total_hours, 0) / g.total_hours) "
+            "ELSE s.gross_pay / g.cnt END")
+
+
+def build_insert_sql():
+    """
+    One INSERT ... SELECT does the whole consolidation on the server:
+    regional rows join their month's salary, hour totals, ABD attributes
+    and PMR manager, and the allocation arithmetic runs inline, so no row
+    data ever crosses into Python.
+    """
+    m = _REGIONAL_MONTH_EXPR
+    return f"""
+        INSERT INTO {DBS['uk']}.{TABLES['consolidated']} (
+            emplid, month, gross_pay, job_code_description, band, technicalbsgsalessupport,
+            current_work_location, project_id, project_description, project_type_desc,
+            project_pricing_type, contract_type, cust_name, pgm_manager_name, pgm_manager_email
+        )
+        SELECT
+            r.emplid, {m}, {gross_pay_expr()},
+            a.job_code_description, a.band, a.technicalbsgsalessupport,
+            r.current_work_location, r.project_id, r.project_description,
+            a.project_type_desc, a.project_pricing_type,
+            r.contract_type, r.cust_name,
+            pm.PGM_MANAGER_NAME, pm.PGM_MANAGER_EMAIL
+        FROM (
+            SELECT r0.*, ROW_NUMBER() OVER (
+                PARTITION BY r0.emplid, DATE_FORMAT(r0.utilization_end_dt, '%m_%Y')
+            ) AS rn
+            FROM {DBS['uk']}.{TABLES['regional']} r0
+        ) r
+        LEFT JOIN (
+            SELECT emplid, DATE_FORMAT(utilization_end_dt, '%m_%Y') AS mkey,
+                   SUM(total_hours) AS total_hours, COUNT(*) AS cnt
+            FROM {DBS['uk']}.{TABLES['regional']}
+            GROUP BY emplid, DATE_FORMAT(utilization_end_dt, '%m_%Y')
+        ) g ON g.emplid = r.emplid AND g.mkey = {m}
+        LEFT JOIN (
+            SELECT emplid, DATE_FORMAT(month, '%m_%Y') AS mkey,
+                   ANY_VALUE(gross_pay) AS gross_pay
+            FROM {DBS['uk']}.{TABLES['salary']}
+            GROUP BY emplid, DATE_FORMAT(month, '%m_%Y')
+        ) s ON s.emplid = r.emplid AND s.mkey = {m}
+        LEFT JOIN abd_combined a
+            ON a.emplid = r.emplid AND a.project_id = r.project_id AND a.abd_month = {m}
+        LEFT JOIN {DBS['pmr']}.{TABLES['pmr']} pm
+            ON pm.PROJECT_ID = r.project_id
     """
-    # Group regional rows by (emplid, month_key)
-    groups = defaultdict(list)
-    for i, r in enumerate(regional_rows):
-        emplid = r[reg_idx["emplid"]]
-        mkey = month_key_from_dt(r[reg_idx["utilization_end_dt"]])
-        groups[(emplid, mkey)].append(i)
-
-    allocated = {i: None for i in range(len(regional_rows))}
-
-    for (emplid, mkey), idxs in groups.items():
-        sal = salary_map.get((emplid, mkey))
-        if sal is None:
-            # nothing to allocate
-            continue
-        if len(idxs) == 1 or GROSS_PAY_ALLOCATION == "first_only":
-            # put all on the first row; others zero
-            first = idxs[0]
-            allocated[first] = sal
-            if GROSS_PAY_ALLOCATION == "first_only":
-                for j in idxs[1:]:
-                    allocated[j] = 0.0
-            else:
-                # len==1 case
-                pass
-        elif GROSS_PAY_ALLOCATION == "split_equal":
-            part = sal / float(len(idxs))
-            for j in idxs:
-                allocated[j] = part
-        elif GROSS_PAY_ALLOCATION == "split_by_hours":
-            # Pro-rate by total_hours
-            hours = []
-            total = 0.0
-            th_idx = reg_idx.get("total_hours")
-            for j in idxs:
-                h = regional_rows[j][th_idx] if th_idx is not None else None
-                h = float(h) if h is not None else 0.0
-                hours.append(h)
-                total += h
-            if total > 0:
-                for j, h in zip(idxs, hours):
-                    allocated[j] = sal * (h / total)
-            else:
-                # fallback to equal split
-                part = sal / float(len(idxs))
-                for j in idxs:
-                    allocated[j] = part
-        else:
-            # safety fallback
-            part = sal / float(len(idxs))
-            for j in idxs:
-                allocated[j] = part
-    return allocated
 
 
 def consolidate():
@@ -226,62 +187,15 @@ def consolidate():
         conn = get_connection()
         cur = conn.cursor()
 
-        # Load all datasets
-        regional_rows, reg_idx = load_regional(cur)
-        salary_rows, sal_idx, salary_map = load_salary(cur)
-        _, _, pmr_map = load_pmr(cur)
-        abd_map = load_abd(cur)
+        # Stage the monthly ABD tables for the join
+        create_abd_combined(cur)
 
         # Prepare consolidated table
         create_consolidated(cur)
 
-        # Pre-compute gross pay allocation per regional row
-        allocation = allocate_salary(regional_rows, reg_idx, salary_map)
-
-        insert_sql = f"""
-            INSERT INTO {DBS['uk']}.{TABLES['consolidated']} (
-                emplid, month, gross_pay, job_code_description, band, technicalbsgsalessupport,
-                current_work_location, project_id, project_description, project_type_desc,
-                project_pricing_type, contract_type, cust_name, pgm_manager_name, pgm_manager_email
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """
-
-        # Insert rows
-        for i, r in enumerate(regional_rows):
-            emplid = r[reg_idx["emplid"]]
-            project_id = r[reg_idx.get("project_id")]
-            mkey = month_key_from_dt(r[reg_idx["utilization_end_dt"]])
-
-            # Salary allocated
-            gross_pay = allocation.get(i)
-
-            # ABD lookups
-            abd_rec = abd_map.get((emplid, project_id, mkey), {})
-
-            # PMR manager
-            pmr_name, pmr_email = (None, None)
-            if project_id in pmr_map:
-                pmr_name, pmr_email = pmr_map[project_id]
-
-            data = (
-                emplid,
-                mkey,
-                gross_pay,
-                abd_rec.get("job_code_description"),
-                abd_rec.get("band"),
-                abd_rec.get("technicalbsgsalessupport"),
-                r[reg_idx.get("current_work_location")],
-                project_id,
-                r[reg_idx.get("project_description")],
-                abd_rec.get("project_type_desc"),
-                abd_rec.get("project_pricing_type"),
-                r[reg_idx.get("contract_type")],
-                r[reg_idx.get("cust_name")],
-                pmr_name,
-                pmr_email,
-            )
-            cur.execute(insert_sql, data)
-
+        # One server-side statement replaces the old fetch-all/allocate/
+        # insert-per-row loop
+        cur.execute(build_insert_sql())
         conn.commit()
 
         if DEBUG: